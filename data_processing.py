@@ -1,21 +1,44 @@
+import functools
 import logging
+import multiprocessing
 import os
 import shutil
+import subprocess
 import tarfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import pandas as pd
 import numpy as np
 import airportsdata
-from datetime import datetime
+from geo import haversine_np
+
+try:
+    import rapidgzip
+except ImportError:
+    rapidgzip = None
+
+try:
+    from isal import igzip
+except ImportError:
+    igzip = None
+
+# columns of the ADS-B state vectors used by the pipeline and their compact dtypes
+ADSB_COLUMNS = ['time', 'lat', 'lon', 'callsign', 'onground', 'geoaltitude']
+ADSB_DTYPES = {'time': 'int32', 'lat': 'float32', 'lon': 'float32', 'callsign': 'category', 'geoaltitude': 'float32'}
+
+# number of flight points formatted and written at once per KML file
+KML_CHUNK_SIZE = 100000
 
 
 def convert_timestamp_to_datetime(timestamp):
     """
     converts timestamp to datetime object
-    :param timestamp:
-    :return:
+    :param timestamp: unix timestamp in seconds, either a scalar or a Series/array of timestamps
+    :return: formatted UTC datetime string, or a Series of strings for array input
     """
-    dt = datetime.utcfromtimestamp(timestamp)
-    return dt.strftime('%d %m %Y %H %M %S')
+    if np.ndim(timestamp) == 0:
+        return pd.to_datetime(timestamp, unit='s', utc=True).strftime('%d %m %Y %H %M %S')
+    return pd.Series(pd.to_datetime(timestamp, unit='s', utc=True)).dt.strftime('%d %m %Y %H %M %S')
 
 
 def extract_tar(file_path):
@@ -24,35 +47,130 @@ def extract_tar(file_path):
     :param file_path: File path of tar file.
     :return: None
     """
-    with tarfile.open(file_path, 'r') as tar:
-        tar.extractall()
+    if shutil.which('tar') is not None:
+        subprocess.run(['tar', '-xf', file_path], check=True)
+    else:
+        with tarfile.open(file_path, 'r') as tar:
+            tar.extractall()
     logging.info('tar file extracted')
 
 
 def xlsx_to_csv(input_file, output_file, sheet_name=0):
-    df = pd.read_excel(input_file, sheet_name=sheet_name, engine='openpyxl')
+    # the converted sheet is recorded next to the csv, a csv of another sheet is never reused
+    sheet_file = f'{output_file}.sheet'
+    if (os.path.exists(output_file) and os.path.getmtime(output_file) >= os.path.getmtime(input_file)
+            and os.path.exists(sheet_file)):
+        with open(sheet_file) as f:
+            if f.read() == repr(sheet_name):
+                logging.info(f"{output_file} is up to date with {input_file}")
+                return
+
+    try:
+        df = pd.read_excel(input_file, sheet_name=sheet_name, engine='calamine')
+    except ImportError:
+        logging.info('python-calamine not installed, falling back to openpyxl')
+        df = pd.read_excel(input_file, sheet_name=sheet_name, engine='openpyxl')
     df.to_csv(output_file, index=False)
+    with open(sheet_file, 'w') as f:
+        f.write(repr(sheet_name))
     logging.info(f"{input_file} saved to {output_file}")
 
 
-def load_csv(file_path, compression=None):
+def load_csv(file_path, compression=None, usecols=None, dtype=None):
     """
     Load csv file as dataframe with pandas.
     :param file_path:  File path of csv file.
+    :param compression: compression of the csv file, e.g. 'gzip'.
+    :param usecols: columns to read, all columns if None.
+    :param dtype: dict of column dtypes, inferred by pandas if None.
     :return: dataframe with pandas.
     """
-    df = pd.read_csv(file_path, compression=compression)
+    if compression == 'gzip' and rapidgzip is not None:
+        # rapidgzip decompresses the deflate blocks in parallel
+        with rapidgzip.open(file_path, parallelization=os.cpu_count()) as f:
+            df = _read_csv(f, compression=None, usecols=usecols, dtype=dtype)
+    elif compression == 'gzip' and igzip is not None:
+        # ISA-L inflates gzip considerably faster than the zlib based gzip module pandas uses
+        with igzip.open(file_path, 'rb') as f:
+            df = _read_csv(f, compression=None, usecols=usecols, dtype=dtype)
+    else:
+        df = _read_csv(file_path, compression=compression, usecols=usecols, dtype=dtype)
+    if 'callsign' in df.columns:
+        df['callsign'] = df['callsign'].astype('category')
+    if 'onground' in df.columns:
+        # missing values count as on ground, the pyarrow engine returns them as None which astype would make False
+        df['onground'] = df['onground'].astype('boolean').fillna(True).astype(bool)
     logging.info(f'loaded csv file from {file_path}')
     return df
 
 
-def write_kml_for_each_callsign(df, animate=False):
+def _read_csv(filepath_or_buffer, compression, usecols, dtype):
+    """
+    Reads a csv file with the pyarrow engine, or with the pandas C parser if pyarrow is not installed.
+    :param filepath_or_buffer: File path or binary file object of the csv file.
+    :param compression: compression of the csv file, e.g. 'gzip'.
+    :param usecols: columns to read, all columns if None.
+    :param dtype: dict of column dtypes, inferred by pandas if None.
+    :return: dataframe with pandas.
+    """
+    try:
+        return pd.read_csv(filepath_or_buffer, compression=compression, usecols=usecols, dtype=dtype, engine='pyarrow')
+    except ImportError:
+        logging.info('pyarrow not installed, falling back to the pandas C parser')
+        return pd.read_csv(filepath_or_buffer, compression=compression, usecols=usecols, dtype=dtype, engine='c')
+
+
+def load_parquet_cache(cache_file_path, source_file_path):
+    """
+    Load a DataFrame cached by `write_parquet_cache` if it is newer than the file it was derived from.
+    :param cache_file_path: File path of the parquet cache.
+    :param source_file_path: File path of the source the cached DataFrame was computed from.
+    :return: cached dataframe, or None if the cache is missing, outdated or cannot be read.
+    """
+    if not os.path.exists(cache_file_path) or os.path.getmtime(cache_file_path) < os.path.getmtime(source_file_path):
+        return None
+    try:
+        df = pd.read_parquet(cache_file_path)
+    except (ImportError, OSError, ValueError) as e:
+        # pyarrow's ArrowInvalid for corrupt files is a ValueError, the cache is then rebuilt
+        logging.warning(f'cannot read parquet cache {cache_file_path}: {e}')
+        return None
+    logging.info(f'loaded cached dataframe from {cache_file_path}')
+    return df
+
+
+def write_parquet_cache(df, cache_file_path):
+    """
+    Cache a DataFrame as zstd compressed parquet file for `load_parquet_cache`.
+    :param df: dataframe to cache.
+    :param cache_file_path: File path of the parquet cache.
+    :return: None
+    """
+    os.makedirs(os.path.dirname(cache_file_path) or '.', exist_ok=True)
+    # write to a temporary file first, so an interrupted run never leaves a truncated cache behind
+    tmp_file_path = f'{cache_file_path}.{os.getpid()}.tmp'
+    try:
+        df.to_parquet(tmp_file_path, compression='zstd')
+        os.replace(tmp_file_path, cache_file_path)
+    except (ImportError, OSError) as e:
+        logging.warning(f'cannot write parquet cache {cache_file_path}: {e}')
+        if os.path.exists(tmp_file_path):
+            os.remove(tmp_file_path)
+        return
+    logging.info(f'cached dataframe at {cache_file_path}')
+
+
+def write_kml_for_each_callsign(df, animate=False, max_workers=None, already_sorted=False):
     """
     Creates a KML file for each unique callsign in the DataFrame. The KML files visualize the flight paths with
     coordinates including longitude, latitude, and altitude. If animate is True, an animated KML path is created.
 
     :param df: pandas DataFrame containing the flight data with columns 'callsign', 'time', 'lon', 'lat', and 'geoaltitude'
     :param animate: Boolean indicating whether to create animated KML paths.
+    :param max_workers: number of worker processes writing KML files, defaults to the number of CPUs. With 1 the
+        files are written in the calling process. The workers are not forked, so scripts calling this need an
+        `if __name__ == '__main__':` guard.
+    :param already_sorted: Boolean indicating that the points of each callsign are already sorted by 'time'.
     :return: None
     """
     kml_folder = 'kml'
@@ -60,93 +178,184 @@ def write_kml_for_each_callsign(df, animate=False):
         shutil.rmtree(kml_folder)
     os.makedirs(kml_folder, exist_ok=True)
 
-    grouped = df.groupby('callsign')
+    valid_mask = ~np.isnan(df[['lon', 'lat', 'geoaltitude']].to_numpy()).any(axis=1)
+    invalid_counts = df.loc[~valid_mask, 'callsign'].value_counts(sort=False)
+    for callsign, invalid_count in invalid_counts[invalid_counts > 0].items():
+        logging.warning(f"{invalid_count} invalid rows for callsign {callsign}")
 
+    grouped = df[valid_mask].groupby('callsign', sort=False, observed=True)
+    callsigns = []
+    groups = []
     for callsign, group in grouped:
-        group = group.sort_values('time')
-
-        if group.empty:
-            logging.info(f"No points available for callsign: {callsign}")
-            continue
-
-        # KML header
-        kml_content = [
-            "<?xml version='1.0' encoding='UTF-8'?>\n",
-            '<kml xmlns="http://www.opengis.net/kml/2.2" xmlns:gx="http://www.google.com/kml/ext/2.2">\n',
-            "<Document>\n",
-            f"<name>Flight path for {callsign}</name>\n"
-        ]
-
-        # Add static or animated path
-        if animate:
-            kml_content.append("<Placemark>\n")
-            kml_content.append(f"<name>Animated Flight path for {callsign}</name>\n")
-            kml_content.append("<gx:Track>\n")
-            kml_content.append("<altitudeMode>absolute</altitudeMode>\n")
-
-            # Add time and coordinates for animation
-            for _, row in group.iterrows():
-                kml_content.append(f"<when>{row['time']}</when>\n")
-                kml_content.append(f"<gx:coord>{row['lon']} {row['lat']} {row['geoaltitude']}</gx:coord>\n")
-
-            kml_content.append("</gx:Track>\n")
-            kml_content.append("</Placemark>\n")
-        else:
-            # Standard static path
-            kml_content.append("<Placemark>\n")
-            kml_content.append(f"   <name>Flight path for {callsign}</name>\n")
-            kml_content.append("   <LineString>\n")
-            kml_content.append("       <extrude>1</extrude>\n")
-            kml_content.append("       <altitudeMode>absolute</altitudeMode>\n")
-            kml_content.append("       <coordinates>\n")
-
-            for _, row in group.iterrows():
-                if pd.notna(row['lon']) and pd.notna(row['lat']) and pd.notna(row['geoaltitude']):
-                    kml_content.append(f"        {row['lon']},{row['lat']},{row['geoaltitude']}\n")
-                else:
-                    logging.warning(f"Invalid coordinates for row {row}")
-
-            kml_content.append("       </coordinates>\n")
-            kml_content.append("   </LineString>\n")
-            kml_content.append("</Placemark>\n")
-
-        # KML footer
-        kml_content.append("</Document>\n</kml>\n")
-
-        # Save the KML file
-        kml_file_path = os.path.join(kml_folder, f'{callsign}.kml')
-        try:
-            with open(kml_file_path, 'w') as f:
-                f.write(''.join(kml_content))
-            logging.info(f"Saved KML for {callsign} at {kml_file_path}")
-        except Exception as e:
-            logging.error(f"Failed to write KML file for {callsign}: {e}")
-
-
-def filter_flights(df, airport_ICAO_code):
+        callsigns.append(callsign)
+        group = group[['time', 'lon', 'lat', 'geoaltitude']]
+        groups.append(group if already_sorted else group.sort_values('time'))
+
+    # starting worker processes only pays off with more than one file to write
+    if max_workers == 1 or len(groups) < 2:
+        _log_kml_results(map(_write_one_kml, callsigns, groups, repeat(animate), repeat(kml_folder)))
+        return
+
+    # forked workers would inherit the thread pool state of numba's parallel rtm_kernel, which makes the parent
+    # process hang at exit, so the workers are started from a clean forkserver (spawn where it is not available)
+    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(start_method)) as executor:
+        _log_kml_results(executor.map(_write_one_kml, callsigns, groups, repeat(animate), repeat(kml_folder),
+                                      chunksize=8))
+
+
+def _log_kml_results(results):
+    """
+    Logs the results of `_write_one_kml` in the calling process. Worker processes started with spawn or forkserver
+    do not inherit the logging setup, so they report back instead of logging themselves.
+
+    :param results: iterable of (level, message) tuples
+    :return: None
+    """
+    for level, message in results:
+        logging.log(level, message)
+
+
+def _write_one_kml(callsign, group, animate, kml_folder):
+    """
+    Writes the KML file of a single callsign, see `write_kml_for_each_callsign`.
+
+    :param callsign: callsign of the flight
+    :param group: DataFrame with the time sorted points of the flight, without NaN coordinates
+    :param animate: Boolean indicating whether to create an animated KML path.
+    :param kml_folder: folder the KML file is written to
+    :return: tuple of log level and message describing the result
+    """
+    if group.empty:
+        return logging.INFO, f"No points available for callsign: {callsign}"
+
+    # KML header
+    kml_header = (
+        "<?xml version='1.0' encoding='UTF-8'?>\n"
+        '<kml xmlns="http://www.opengis.net/kml/2.2" xmlns:gx="http://www.google.com/kml/ext/2.2">\n'
+        "<Document>\n"
+        f"<name>Flight path for {callsign}</name>\n"
+    )
+
+    # Add static or animated path
+    if animate:
+        kml_header += (
+            "<Placemark>\n"
+            f"<name>Animated Flight path for {callsign}</name>\n"
+            "<gx:Track>\n"
+            "<altitudeMode>absolute</altitudeMode>\n"
+        )
+
+        kml_footer = (
+            "</gx:Track>\n"
+            "</Placemark>\n"
+        )
+    else:
+        # Standard static path
+        kml_header += (
+            "<Placemark>\n"
+            f"   <name>Flight path for {callsign}</name>\n"
+            "   <LineString>\n"
+            "       <extrude>1</extrude>\n"
+            "       <altitudeMode>absolute</altitudeMode>\n"
+            "       <coordinates>\n"
+        )
+
+        kml_footer = (
+            "       </coordinates>\n"
+            "   </LineString>\n"
+            "</Placemark>\n"
+        )
+
+    # KML footer
+    kml_footer += "</Document>\n</kml>\n"
+
+    # Save the KML file
+    kml_file_path = os.path.join(kml_folder, f'{callsign}.kml')
+    try:
+        with open(kml_file_path, 'wb', buffering=1 << 20) as f:
+            f.write(kml_header.encode('utf-8'))
+            # format and write the points chunk-wise so the body is never held in memory as a whole
+            for start in range(0, len(group), KML_CHUNK_SIZE):
+                f.write(_format_kml_points(group.iloc[start:start + KML_CHUNK_SIZE], animate).encode('utf-8'))
+            f.write(kml_footer.encode('utf-8'))
+    except Exception as e:
+        return logging.ERROR, f"Failed to write KML file for {callsign}: {e}"
+    return logging.INFO, f"Saved KML for {callsign} at {kml_file_path}"
+
+
+def _format_kml_points(points, animate):
+    """
+    Formats flight points as the coordinate lines of a KML LineString or, if animate is True, as gx:Track entries.
+
+    :param points: DataFrame with columns 'time', 'lon', 'lat' and 'geoaltitude' without NaN coordinates
+    :param animate: Boolean indicating whether to format animated gx:Track entries.
+    :return: str with one line (two lines if animated) per point
+    """
+    if animate:
+        # <when> expects ISO 8601 timestamps, np.datetime_as_string formats them in C unlike .dt.strftime
+        timestamps = pd.Series(np.datetime_as_string(points['time'].to_numpy().astype('datetime64[s]'), unit='s'),
+                               index=points.index)
+        return ('<when>' + timestamps + 'Z</when>\n<gx:coord>' + points['lon'].astype(str) + ' ' +
+                points['lat'].astype(str) + ' ' + points['geoaltitude'].astype(str) + '</gx:coord>\n').str.cat()
+
+    return ('        ' + points['lon'].astype(str) + ',' + points['lat'].astype(str) + ',' +
+            points['geoaltitude'].astype(str) + '\n').str.cat()
+
+
+@functools.lru_cache(maxsize=1)
+def airports():
+    """
+    Loads the airportsdata database once and keeps it for subsequent calls.
+    :return: dict of airports keyed by ICAO code.
+    """
+    return airportsdata.load()
+
+
+def filter_flights(df, airport_ICAO_code, radius_km=10):
     """
     Filters the DataFrame to retain only those flights (callsigns) that land or start at a certain airport_ICAO_code.
 
     :param df: pandas DataFrame containing the flight data with columns 'callsign', 'time', 'lon', 'lat', 'geoaltitude'
     :param airport_ICAO_code: airport_ICAO_code ICAO code to filter
+    :param radius_km: maximum distance in km from the airport for a low-altitude point to count as landing or start
     :return: filtered DataFrame by 'callsign'
     """
+    mask = _near_airport(df['lat'].to_numpy(), df['lon'].to_numpy(), df['geoaltitude'].to_numpy(),
+                         airport_ICAO_code, radius_km)
 
-    def within_airport_area(row):
-        """
-        Check if the given row's coordinates are within a certain threshold distance from the specified airport_ICAO_code coordinates.
+    return df[_rows_of_callsigns(df['callsign'], mask)]
 
-        :param row: A pandas Series representing a row in the DataFrame.
-        :return: True if the row is within the threshold distance from the airport_ICAO_code, False otherwise.
-        """
-        return abs(row['lat'] - airport_lat) < 0.1 and abs(row['lon'] - airport_lon) < 0.1
 
-    airports = airportsdata.load()
-    airport_lat = airports[airport_ICAO_code]['lat']
-    airport_lon = airports[airport_ICAO_code]['lon']
-    filtered_df = df[(df['geoaltitude'] < 1000) & df.apply(within_airport_area, axis=1)]
+def _rows_of_callsigns(callsign, mask):
+    """
+    Marks all rows whose callsign occurs in at least one row selected by `mask`.
+
+    :param callsign: Series of callsigns
+    :param mask: boolean NumPy array selecting the qualifying rows
+    :return: boolean NumPy array
+    """
+    codes, uniques = pd.factorize(callsign)
+    # missing callsigns get code -1 and therefore use the extra last slot
+    keep = np.zeros(len(uniques) + 1, dtype=bool)
+    keep[codes[mask]] = True
+    return keep[codes]
 
-    return df[df['callsign'].isin(filtered_df['callsign'].unique())]
+
+def _near_airport(lat, lon, alt, airport_ICAO_code, radius_km):
+    """
+    Marks the points below 1000 m that lie within `radius_km` of the airport.
+
+    :param lat: NumPy array of latitudes
+    :param lon: NumPy array of longitudes
+    :param alt: NumPy array of geoaltitudes
+    :param airport_ICAO_code: ICAO code of the airport
+    :param radius_km: maximum distance in km from the airport
+    :return: boolean NumPy array
+    """
+    airport = airports()[airport_ICAO_code]
+    dist = haversine_np(lat, lon, airport['lat'], airport['lon'])
+    return (alt < 1000) & (dist < radius_km)
 
 
 def drop_nan_rows(df):
@@ -156,11 +365,58 @@ def drop_nan_rows(df):
     :param df: pandas DataFrame containing the flight data with columns 'lat', 'geoaltitude', 'lon', and others.
     :return: DataFrame with rows containing NaN values in the specified columns removed.
     """
-    df_cleaned = df.dropna(subset=['lat', 'lon', 'geoaltitude'])
+    valid = ~np.isnan(df[['lat', 'lon', 'geoaltitude']].to_numpy()).any(axis=1)
+    df_cleaned = df[valid]
 
     return df_cleaned
 
 
+def clean_and_filter(df, airport_ICAO_code, radius_km=10):
+    """
+    Combines `drop_nan_rows` and `filter_flights` into a single pass over the coordinate columns.
+
+    :param df: pandas DataFrame containing the flight data with columns 'callsign', 'time', 'lon', 'lat', 'geoaltitude'
+    :param airport_ICAO_code: airport_ICAO_code ICAO code to filter
+    :param radius_km: maximum distance in km from the airport for a low-altitude point to count as landing or start
+    :return: DataFrame without NaN coordinates, filtered by 'callsign'
+    """
+    return df[_clean_and_filter_mask(df, airport_ICAO_code, radius_km)]
+
+
+def _clean_and_filter_mask(df, airport_ICAO_code, radius_km):
+    """
+    Row mask of `clean_and_filter`.
+
+    :param df: pandas DataFrame containing the flight data with columns 'callsign', 'lon', 'lat', 'geoaltitude'
+    :param airport_ICAO_code: airport_ICAO_code ICAO code to filter
+    :param radius_km: maximum distance in km from the airport for a low-altitude point to count as landing or start
+    :return: boolean NumPy array
+    """
+    lat, lon, alt = (df[column].to_numpy() for column in ['lat', 'lon', 'geoaltitude'])
+    finite = np.isfinite(lat) & np.isfinite(lon) & np.isfinite(alt)
+    near = _near_airport(lat, lon, alt, airport_ICAO_code, radius_km)
+
+    return finite & _rows_of_callsigns(df['callsign'], finite & near)
+
+
+def preprocess(df, airport_ICAO_code, radius_km=10, threshold=200):
+    """
+    Runs `drop_nan_rows`, `filter_flights`, `remove_outliers` and `remove_outliers_geoaltitude` on the ADS-B data.
+    The three row filters are combined into one mask so that the full DataFrame is copied only once.
+
+    :param df: pandas DataFrame containing the flight data with columns 'callsign', 'time', 'lon', 'lat', 'geoaltitude'
+    :param airport_ICAO_code: airport_ICAO_code ICAO code to filter
+    :param radius_km: maximum distance in km from the airport for a low-altitude point to count as landing or start
+    :param threshold: threshold for the difference between consecutive altitudes, see `remove_outliers_geoaltitude`
+    :return: preprocessed DataFrame
+    """
+    mask = _clean_and_filter_mask(df, airport_ICAO_code, radius_km)
+    # the quartiles refer to the remaining points of each callsign, so only those columns are gathered for them
+    mask[mask] = _outlier_mask(df.loc[mask, ['callsign', 'lon', 'lat', 'geoaltitude']])
+
+    return remove_outliers_geoaltitude(df[mask], threshold=threshold)
+
+
 def remove_outliers(df):
     """
     Entfernt Ausreißer aus den 'lon', 'lat' und 'geoaltitude' Spalten eines DataFrames.
@@ -169,23 +425,29 @@ def remove_outliers(df):
     :return: DataFrame: Der bereinigte DataFrame mit entfernten Ausreißern.
     """
 
-    def filter_outliers(group):
-        Q1 = group[['lon', 'lat', 'geoaltitude']].quantile(0.25)
-        Q3 = group[['lon', 'lat', 'geoaltitude']].quantile(0.75)
-        IQR = Q3 - Q1
+    df_cleaned = df[_outlier_mask(df)]
 
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
+    return df_cleaned
 
-        return group[
-            (group['lon'] >= lower_bound['lon']) & (group['lon'] <= upper_bound['lon']) &
-            (group['lat'] >= lower_bound['lat']) & (group['lat'] <= upper_bound['lat']) &
-            (group['geoaltitude'] >= lower_bound['geoaltitude']) & (group['geoaltitude'] <= upper_bound['geoaltitude'])
-            ]
 
-    df_cleaned = df.groupby('callsign', group_keys=False).apply(filter_outliers)
+def _outlier_mask(df):
+    """
+    Marks the rows whose 'lon', 'lat' and 'geoaltitude' lie within 1.5 IQR of the quartiles of their callsign.
 
-    return df_cleaned
+    :param df: pandas DataFrame with columns 'callsign', 'lon', 'lat', 'geoaltitude'
+    :return: boolean NumPy array
+    """
+    cols = ['lon', 'lat', 'geoaltitude']
+    grouped = df.groupby('callsign', sort=False, observed=True)[cols]
+    Q1 = grouped.transform('quantile', 0.25).to_numpy()
+    Q3 = grouped.transform('quantile', 0.75).to_numpy()
+    IQR = Q3 - Q1
+
+    lower_bound = Q1 - 1.5 * IQR
+    upper_bound = Q3 + 1.5 * IQR
+
+    values = df[cols].to_numpy()
+    return ((values >= lower_bound) & (values <= upper_bound)).all(axis=1)
 
 
 def remove_outliers_geoaltitude(df, threshold=200):
@@ -197,17 +459,48 @@ def remove_outliers_geoaltitude(df, threshold=200):
     :param threshold: Schwellenwert für die Differenz zwischen aufeinander folgenden Höhenwerten
     :return: DataFrame ohne Ausreißer
     """
-    df['prev_geoaltitude'] = df.groupby('callsign')['geoaltitude'].shift(1)
-    df['altitude_diff'] = df['geoaltitude'] - df['prev_geoaltitude']
+    # hash the callsigns once and reuse the integer codes for both groupby passes
+    callsign_codes, _ = pd.factorize(df['callsign'])
 
-    for callsign, group in df.groupby('callsign'):
-        for index, row in group.iterrows():
-            if not pd.isna(row['altitude_diff']) and abs(row['altitude_diff']) > threshold:
-                logging.info(f'removed for {callsign} the geoaltitude: {df.loc[index, "geoaltitude"]} m')
-                df.loc[index, 'geoaltitude'] = np.nan
+    altitude_diff = df['geoaltitude'].groupby(callsign_codes, sort=False).diff().to_numpy()
 
-    df = df.drop(columns=['prev_geoaltitude', 'altitude_diff'])
+    bad = np.abs(altitude_diff) > threshold
+    geoaltitude = df['geoaltitude'].to_numpy(copy=True)
+    geoaltitude[bad] = np.nan
+    logging.info(f'removed {bad.sum()} outlier altitudes')
 
-    df['geoaltitude'] = df.groupby('callsign')['geoaltitude'].transform(lambda x: x.interpolate(method='linear'))
+    df = df.assign(geoaltitude=_interpolate_groups(geoaltitude, callsign_codes))
 
     return df
+
+
+def _interpolate_groups(values, codes):
+    """
+    Linearly interpolates NaN values within each group, like `Series.interpolate(method='linear')` per group,
+    but in one pass over all groups: interpolation never crosses a group boundary, leading NaNs of a group stay NaN
+    and trailing NaNs take the last valid value.
+
+    :param values: NumPy float array
+    :param codes: NumPy array of integer group codes, one per value
+    :return: NumPy array with interpolated values in the original order
+    """
+    order = np.argsort(codes, kind='stable')
+    sorted_values = values[order]
+    sorted_codes = codes[order]
+
+    valid = ~np.isnan(sorted_values)
+    if not valid.any():
+        return values
+
+    positions = np.arange(len(sorted_values))
+    interpolated = np.interp(positions, positions[valid], sorted_values[valid])
+
+    grouped = pd.Series(sorted_values).groupby(sorted_codes, sort=False)
+    previous_valid = grouped.ffill().to_numpy()
+    next_valid = grouped.bfill().to_numpy()
+    interpolated = np.where(np.isnan(next_valid), previous_valid, interpolated)
+    interpolated[np.isnan(previous_valid)] = np.nan
+
+    result = np.empty_like(values)
+    result[order] = interpolated
+    return result
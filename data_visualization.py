@@ -1,15 +1,15 @@
 import logging
-import airportsdata
 import numpy as np
 import plotly.graph_objects as go
+from data_processing import airports
 
 
-def visualize(adsb_data, waypoints_data, airport_ICAO_code, show_animation):
+def visualize(adsb_data, waypoints_data, airport_ICAO_code, show_animation, merge_traces=False):
     logging.info('start data visualization')
     fig = go.Figure()
     fig = plot_waypoints(df=waypoints_data, fig=fig, airport_ICAO_code=airport_ICAO_code)
     fig = visualize_flight_trajectories(df=adsb_data, fig=fig, airport_ICAO_code=airport_ICAO_code,
-                                        show_animation=show_animation)
+                                        show_animation=show_animation, merge_traces=merge_traces)
     fig.show()
 
 
@@ -24,8 +24,9 @@ def plot_waypoints(df, fig, airport_ICAO_code):
     """
     df_filtered = df[(df['Associated Airport'] == airport_ICAO_code) &
                      (df['Type'].isin(['ICAO', 'TERMINAL']))]
-    for index, waypoint in df_filtered.iterrows():
-        logging.info(f'Waypoint {waypoint["Name"]}')
+    if logging.getLogger().isEnabledFor(logging.INFO):
+        for name in df_filtered['Name']:
+            logging.info(f'Waypoint {name}')
     z = np.zeros(len(df_filtered))
 
     fig.add_trace(go.Scatter3d(
@@ -42,43 +43,34 @@ def plot_waypoints(df, fig, airport_ICAO_code):
     return fig
 
 
-def visualize_flight_trajectories(df, fig, airport_ICAO_code, show_animation=True):
+def visualize_flight_trajectories(df, fig, airport_ICAO_code, show_animation=True, merge_traces=False):
     """
     Visualizes the 3D flight trajectories grouped by callsigns with time-based animation.
 
     :param show_animation: if true animates the flight trajectories
+    :param merge_traces: if true draws all flights as one trace separated by NaN gaps instead of one trace per
+        callsign, which keeps the figure small for many callsigns but drops the per-callsign legend entries
     :param df: DataFrame containing flight data with columns 'lon', 'lat', 'geoaltitude', 'callsign', and 'time'.
     :return: None. Displays an interactive 3D animated plot.
     """
 
     df = df.sort_values(by='time')
-    df_grouped = df.groupby('callsign')
-    airports = airportsdata.load()
-    airport_name = airports[airport_ICAO_code]['name']
-
-    for name, group in df_grouped:
-        fig.add_trace(go.Scatter3d(
-            x=group['lon'],
-            y=group['lat'],
-            z=group['geoaltitude'],
-            mode='lines+markers',
-            name=name,
-            text=group['time'],
-            marker=dict(size=4),
-            line=dict(width=2),
-            hovertemplate="Longitude: %{x}<br>" +
-                          "Latitude: %{y}<br>" +
-                          "Altitude: %{z}<br>" +
-                          "Time: %{text}<br>" +
-                          "RTM: %{customdata:.2f} km<extra></extra>",
-            customdata=group['rtm']
-        ))
+    df_grouped = df.groupby('callsign', observed=True)
+    airport_name = airports()[airport_ICAO_code]['name']
+
+    # time sorted arrays per callsign, the points shown up to time t are the prefix found by searchsorted
+    flights = [(name, *(group[column].to_numpy() for column in ['lon', 'lat', 'geoaltitude', 'time', 'rtm']))
+               for name, group in df_grouped]
+
+    for trace in _flight_traces(flights, merge_traces):
+        fig.add_trace(trace)
 
     # Common layout settings
+    bounds = df[['lon', 'lat', 'geoaltitude']].agg(['min', 'max'])
     scene_settings = dict(
-        xaxis=dict(nticks=10, range=[df['lon'].min(), df['lon'].max()]),
-        yaxis=dict(nticks=10, range=[df['lat'].min(), df['lat'].max()]),
-        zaxis=dict(nticks=10, range=[0, max(df['geoaltitude'].max(), 10)]),
+        xaxis=dict(nticks=10, range=[bounds.loc['min', 'lon'], bounds.loc['max', 'lon']]),
+        yaxis=dict(nticks=10, range=[bounds.loc['min', 'lat'], bounds.loc['max', 'lat']]),
+        zaxis=dict(nticks=10, range=[0, max(bounds.loc['max', 'geoaltitude'], 10)]),
         xaxis_title='Longitude',
         yaxis_title='Latitude',
         zaxis_title='Altitude',
@@ -101,26 +93,66 @@ def visualize_flight_trajectories(df, fig, airport_ICAO_code, show_animation=Tru
                                                              fromcurrent=False)])])],
         )
 
-        frames = [go.Frame(data=[go.Scatter3d(
-            x=group['lon'][group['time'] <= t],
-            y=group['lat'][group['time'] <= t],
-            z=group['geoaltitude'][group['time'] <= t],
+        frames = []
+        for t in np.unique(df['time'].to_numpy()):
+            flights_until_t = []
+            for name, *columns in flights:
+                end = np.searchsorted(columns[3], t, side='right')
+                flights_until_t.append((name, *(column[:end] for column in columns)))
+            frames.append(go.Frame(data=_flight_traces(flights_until_t, merge_traces), name=str(t),
+                                   layout=go.Layout(title=f'Flight Trajectories at Time {t}')))
+
+        fig.frames = frames
+
+    return fig
+
+
+def _flight_traces(flights, merge_traces):
+    """
+    Creates the Scatter3d traces of the flights.
+
+    :param flights: list of tuples (callsign, lon, lat, geoaltitude, time, rtm) with NumPy arrays sorted by time
+    :param merge_traces: if true returns a single trace with NaN gaps between the callsigns
+    :return: list of Scatter3d traces
+    """
+    if not merge_traces:
+        return [go.Scatter3d(
+            x=lon,
+            y=lat,
+            z=alt,
             mode='lines+markers',
             name=name,
+            text=time,
             marker=dict(size=4),
             line=dict(width=2),
-            text=group['time'][group['time'] <= t],
             hovertemplate="Longitude: %{x}<br>" +
                           "Latitude: %{y}<br>" +
                           "Altitude: %{z}<br>" +
                           "Time: %{text}<br>" +
                           "RTM: %{customdata:.2f} km<extra></extra>",
-            customdata=group['rtm'][group['time'] <= t]
-        ) for name, group in df_grouped],
-            name=str(t),
-            layout=go.Layout(title=f'Flight Trajectories at Time {t}')
-        ) for t in sorted(df['time'].unique())]
-
-        fig.frames = frames
-
-    return fig
+            customdata=rtm
+        ) for name, lon, lat, alt, time, rtm in flights]
+
+    # a NaN point after every flight breaks the line between consecutive callsigns
+    gap = np.array([np.nan])
+    lon, lat, alt, time, rtm = (np.concatenate([part for flight in flights for part in (flight[i], gap)] or [gap])
+                                for i in range(1, 6))
+    callsigns = np.repeat([name for name, *_ in flights], [len(flight[1]) + 1 for flight in flights])
+
+    return [go.Scatter3d(
+        x=lon,
+        y=lat,
+        z=alt,
+        mode='lines+markers',
+        name='Flights',
+        text=callsigns,
+        marker=dict(size=4),
+        line=dict(width=2),
+        hovertemplate="Callsign: %{text}<br>" +
+                      "Longitude: %{x}<br>" +
+                      "Latitude: %{y}<br>" +
+                      "Altitude: %{z}<br>" +
+                      "Time: %{customdata[1]}<br>" +
+                      "RTM: %{customdata[0]:.2f} km<extra></extra>",
+        customdata=np.column_stack((rtm, time))
+    )]
@@ -0,0 +1,64 @@
+import numpy as np
+
+# mean earth radius for great-circle distances and the WGS84 ellipsoid
+EARTH_RADIUS_KM = 6371
+WGS84_RADIUS_KM = 6378.137
+WGS84_FLATTENING = 1 / 298.257223563
+
+
+def haversine_np(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance between points in degrees, vectorized over NumPy arrays.
+
+    :param lat1: latitude(s) of the first point(s)
+    :param lon1: longitude(s) of the first point(s)
+    :param lat2: latitude(s) of the second point(s)
+    :param lon2: longitude(s) of the second point(s)
+    :return: distance(s) in kilometers
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def cheap_ruler_np(lat1, lon1, lat2, lon2):
+    """
+    Distance between nearby points in degrees with Mapbox' cheap ruler approximation of the WGS84 ellipsoid,
+    vectorized over NumPy arrays. Faster than `haversine_np` and more accurate for the short hops
+    between consecutive ADS-B positions.
+
+    :param lat1: latitude(s) of the first point(s)
+    :param lon1: longitude(s) of the first point(s)
+    :param lat2: latitude(s) of the second point(s)
+    :param lon2: longitude(s) of the second point(s)
+    :return: distance(s) in kilometers
+    """
+    e2 = WGS84_FLATTENING * (2 - WGS84_FLATTENING)
+    coslat = np.cos(np.radians((lat1 + lat2) / 2))
+    w2 = 1 / (1 - e2 * (1 - coslat ** 2))
+    w = np.sqrt(w2)
+    # kilometers per degree of longitude and latitude at the mean latitude
+    kx = np.radians(WGS84_RADIUS_KM) * w * coslat
+    ky = np.radians(WGS84_RADIUS_KM) * w * w2 * (1 - e2)
+    dlon = (lon2 - lon1 + 180) % 360 - 180
+    return np.sqrt((dlon * kx) ** 2 + ((lat2 - lat1) * ky) ** 2)
+
+
+def geodetic_to_ecef_np(lat, lon):
+    """
+    Earth-centered, earth-fixed coordinates of points in degrees on the surface of the WGS84 ellipsoid,
+    vectorized over NumPy arrays.
+
+    :param lat: latitude(s) in degrees
+    :param lon: longitude(s) in degrees
+    :return: tuple of x, y and z coordinate(s) in kilometers
+    """
+    e2 = WGS84_FLATTENING * (2 - WGS84_FLATTENING)
+    lat, lon = np.radians(lat), np.radians(lon)
+    sinlat = np.sin(lat)
+    coslat = np.cos(lat)
+    # prime vertical radius of curvature
+    n = WGS84_RADIUS_KM / np.sqrt(1 - e2 * sinlat ** 2)
+    return n * coslat * np.cos(lon), n * coslat * np.sin(lon), n * (1 - e2) * sinlat
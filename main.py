@@ -1,33 +1,43 @@
 import logging
+import os
 import data_processing
 import data_visualization
 import trackmiles
 
-logging.basicConfig(
-    filename='debug.log',
-    level=logging.INFO,
-    format='%(asctime)s: %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    filemode='w'
-)
+if __name__ == '__main__':
+    logging.basicConfig(
+        filename='debug.log',
+        level=logging.INFO,
+        format='%(asctime)s: %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S',
+        filemode='w'
+    )
 
-waypoints_file_path = 'data/AIP/2 AIP Database/ED_Waypoints_2024-09-05_2024-09-05_snapshot.csv'
-adsb_data_file_path = 'data/ADS-B/states_2022-06-27-20.csv.gz'
-airport_ICAO_code = 'EDDS'
-show_animation = True
+    waypoints_file_path = 'data/AIP/2 AIP Database/ED_Waypoints_2024-09-05_2024-09-05_snapshot.csv'
+    adsb_data_file_path = 'data/ADS-B/states_2022-06-27-20.csv.gz'
+    airport_ICAO_code = 'EDDS'
+    radius_km = 10
+    altitude_threshold = 200
+    # the cached data depends on every preprocessing parameter, changing one of them starts a new cache
+    adsb_cache_file_path = (f'cache/{airport_ICAO_code}_r{radius_km}_t{altitude_threshold}_'
+                            f'{os.path.basename(adsb_data_file_path)}.parquet')
+    show_animation = True
 
-logging.info('start data preprocessing')
-waypoints_data = data_processing.load_csv(file_path=waypoints_file_path)
+    logging.info('start data preprocessing')
+    waypoints_data = data_processing.load_csv(file_path=waypoints_file_path)
 
-adsb_data = data_processing.load_csv(file_path=adsb_data_file_path, compression='gzip')
-adsb_data = data_processing.drop_nan_rows(df=adsb_data)
-adsb_data = data_processing.filter_flights(df=adsb_data, airport_ICAO_code=airport_ICAO_code)
-adsb_data = data_processing.remove_outliers(df=adsb_data)
-adsb_data = data_processing.remove_outliers_geoaltitude(df=adsb_data)
+    adsb_data = data_processing.load_parquet_cache(cache_file_path=adsb_cache_file_path,
+                                                   source_file_path=adsb_data_file_path)
+    if adsb_data is None:
+        adsb_data = data_processing.load_csv(file_path=adsb_data_file_path, compression='gzip',
+                                             usecols=data_processing.ADSB_COLUMNS, dtype=data_processing.ADSB_DTYPES)
+        adsb_data = data_processing.preprocess(df=adsb_data, airport_ICAO_code=airport_ICAO_code,
+                                               radius_km=radius_km, threshold=altitude_threshold)
+        data_processing.write_parquet_cache(df=adsb_data, cache_file_path=adsb_cache_file_path)
 
-adsb_data = trackmiles.calculate_remaining_track_miles(df=adsb_data)
+    adsb_data = trackmiles.calculate_remaining_track_miles(df=adsb_data)
 
-data_visualization.visualize(adsb_data=adsb_data, waypoints_data=waypoints_data, airport_ICAO_code=airport_ICAO_code,
-                             show_animation=show_animation)
+    data_visualization.visualize(adsb_data=adsb_data, waypoints_data=waypoints_data,
+                                 airport_ICAO_code=airport_ICAO_code, show_animation=show_animation)
 
-data_processing.write_kml_for_each_callsign(df=adsb_data, animate=show_animation)
\ No newline at end of file
+    data_processing.write_kml_for_each_callsign(df=adsb_data, animate=show_animation, already_sorted=True)
\ No newline at end of file
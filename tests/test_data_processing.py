@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+import data_processing
+
+
+def _interpolate_per_group(values, codes):
+    # reference: the former per-group lambda in remove_outliers_geoaltitude
+    return pd.Series(values).groupby(codes, sort=False).transform(
+        lambda x: x.interpolate(method='linear')).to_numpy()
+
+
+def test_interpolate_groups_edges():
+    nan = np.nan
+    values = np.array([nan, 1.0, nan, 3.0, nan, nan, 10.0, nan, 30.0, nan, nan, nan])
+    codes = np.array([0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 2, 2])
+    expected = np.array([nan, 1.0, 2.0, 3.0, 3.0, nan, 10.0, 20.0, 30.0, 30.0, nan, nan])
+    np.testing.assert_array_equal(data_processing._interpolate_groups(values, codes), expected)
+
+
+def test_interpolate_groups_does_not_cross_interleaved_groups():
+    nan = np.nan
+    values = np.array([0.0, 100.0, nan, nan, 4.0, 200.0])
+    codes = np.array([0, 1, 0, 1, 0, 1])
+    expected = np.array([0.0, 100.0, 2.0, 150.0, 4.0, 200.0])
+    np.testing.assert_array_equal(data_processing._interpolate_groups(values, codes), expected)
+
+
+def test_interpolate_groups_all_nan():
+    values = np.full(4, np.nan)
+    result = data_processing._interpolate_groups(values, np.array([0, 0, 1, 1]))
+    assert np.isnan(result).all()
+
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_interpolate_groups_matches_per_group_interpolate(dtype):
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        n = rng.integers(1, 80)
+        values = rng.normal(1000, 300, n).astype(dtype)
+        values[rng.random(n) < 0.4] = np.nan
+        codes = rng.integers(0, 6, n)
+        np.testing.assert_allclose(data_processing._interpolate_groups(values, codes),
+                                   _interpolate_per_group(values, codes), rtol=1e-6)
+
+
+@pytest.mark.filterwarnings('error')
+def test_load_csv_missing_onground_counts_as_on_ground(tmp_path):
+    file_path = tmp_path / 'states.csv.gz'
+    pd.DataFrame({'time': [1, 2, 3], 'lat': [48.1, 48.2, 48.3], 'lon': [9.1, 9.2, 9.3], 'callsign': ['A', 'A', 'A'],
+                  'onground': [False, None, True], 'geoaltitude': [100.0, 200.0, 300.0]}).to_csv(file_path, index=False)
+    df = data_processing.load_csv(file_path=str(file_path), compression='gzip', usecols=data_processing.ADSB_COLUMNS,
+                                  dtype=data_processing.ADSB_DTYPES)
+    assert df['onground'].dtype == bool
+    assert df['onground'].tolist() == [False, True, True]
+
+
+def test_xlsx_to_csv_reconverts_for_another_sheet(tmp_path):
+    pytest.importorskip('openpyxl')
+    input_file = tmp_path / 'waypoints.xlsx'
+    output_file = str(tmp_path / 'waypoints.csv')
+    with pd.ExcelWriter(input_file) as writer:
+        pd.DataFrame({'Name': ['A']}).to_excel(writer, sheet_name='first', index=False)
+        pd.DataFrame({'Name': ['B']}).to_excel(writer, sheet_name='second', index=False)
+
+    data_processing.xlsx_to_csv(input_file, output_file, sheet_name='first')
+    assert pd.read_csv(output_file)['Name'].tolist() == ['A']
+    data_processing.xlsx_to_csv(input_file, output_file, sheet_name='second')
+    assert pd.read_csv(output_file)['Name'].tolist() == ['B']
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+import geo
+import trackmiles
+
+
+def _ecef_chord(lat1, lon1, lat2, lon2):
+    return np.linalg.norm(np.subtract(geo.geodetic_to_ecef_np(lat2, lon2), geo.geodetic_to_ecef_np(lat1, lon1)))
+
+
+DISTANCES = {'cheap_ruler': geo.cheap_ruler_np, 'haversine': geo.haversine_np, 'ecef_chord': _ecef_chord}
+
+
+def _reference_rtm(df, measure):
+    # reference: walk each flight backwards point by point, a point on the ground restarts the sum at 0
+    distance = DISTANCES[measure]
+    flights = []
+    for _, flight in df.groupby('callsign', sort=True):
+        flight = flight.sort_values('time')
+        lat = flight['lat'].to_numpy(dtype=np.float64)
+        lon = flight['lon'].to_numpy(dtype=np.float64)
+        onground = flight['onground'].to_numpy()
+        rtm = np.zeros(len(flight))
+        remaining = 0.0
+        for i in range(len(flight) - 1, 0, -1):
+            remaining = 0.0 if onground[i] else remaining + distance(lat[i - 1], lon[i - 1], lat[i], lon[i])
+            rtm[i - 1] = remaining
+        flights.append(flight.assign(rtm=rtm))
+    return pd.concat(flights)
+
+
+@pytest.fixture(params=['numpy', 'kernel'])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        monkeypatch.setattr(trackmiles, 'rtm_kernel', None)
+    elif trackmiles.rtm_kernel is None:
+        pytest.skip('numba not installed')
+    return request.param
+
+
+def _flights(callsign, time, lat, lon, onground):
+    return pd.DataFrame({'callsign': callsign, 'time': time, 'lat': lat, 'lon': lon, 'onground': onground})
+
+
+def _assert_matches_reference(df, measure):
+    result = trackmiles.calculate_remaining_track_miles(df, measure)
+    expected = _reference_rtm(df, measure)
+    merged = result.merge(expected, on=['callsign', 'time'], suffixes=('', '_expected'))
+    assert len(merged) == len(df)
+    np.testing.assert_allclose(merged['rtm'], merged['rtm_expected'], rtol=1e-9, atol=1e-9)
+    return result
+
+
+@pytest.mark.parametrize('measure', list(trackmiles.DISTANCE_MEASURES))
+def test_onground_resets(backend, measure):
+    df = _flights(['A'] * 6, range(6), [48.0, 48.01, 48.02, 48.03, 48.04, 48.05], [9.0] * 6,
+                  [False, False, True, False, False, True])
+    rtm = _assert_matches_reference(df, measure)['rtm'].to_numpy()
+    segment = DISTANCES[measure](48.0, 9.0, 48.01, 9.0)
+    # the sum ends at the next ground point and restarts from there
+    np.testing.assert_allclose(rtm[[1, 4, 5]], 0, atol=1e-12)
+    np.testing.assert_allclose(rtm[[0, 2, 3]], [segment, 2 * segment, segment], rtol=1e-3)
+
+
+@pytest.mark.parametrize('measure', list(trackmiles.DISTANCE_MEASURES))
+def test_flight_boundaries(backend, measure):
+    # interleaved in time and unsorted, no distance may be counted between the two flights
+    df = _flights(['B', 'A', 'B', 'A', 'B', 'A'], [3, 2, 1, 1, 2, 3], [50.0, 48.02, 50.0, 48.0, 50.0, 48.04],
+                  [9.02, 9.0, 9.0, 9.0, 9.01, 9.0], False)
+    result = _assert_matches_reference(df, measure)
+    assert result['callsign'].tolist() == ['A', 'A', 'A', 'B', 'B', 'B']
+    assert result['time'].tolist() == [1, 2, 3, 1, 2, 3]
+    assert result.loc[[2, 5], 'rtm'].tolist() == [0, 0]
+
+
+@pytest.mark.parametrize('measure', list(trackmiles.DISTANCE_MEASURES))
+def test_single_point_flights(backend, measure):
+    df = _flights(['A', 'B', 'C', 'C'], [1, 1, 1, 2], [48.0, 49.0, 50.0, 50.1], [9.0, 9.0, 9.0, 9.0], False)
+    rtm = _assert_matches_reference(df, measure)['rtm'].tolist()
+    assert rtm[0] == rtm[1] == rtm[3] == 0
+    assert rtm[2] > 0
+
+
+@pytest.mark.parametrize('measure', list(trackmiles.DISTANCE_MEASURES))
+def test_matches_reference_on_random_flights(backend, measure):
+    rng = np.random.default_rng(0)
+    for _ in range(30):
+        n = rng.integers(1, 60)
+        df = _flights(rng.choice(list('ABCDE'), n), rng.permutation(n), 48 + rng.random(n), 9 + rng.random(n),
+                      rng.random(n) < 0.2)
+        df['lat'] = df['lat'].astype(np.float32)
+        df['lon'] = df['lon'].astype(np.float32)
+        _assert_matches_reference(df, measure)
+
+
+def test_unknown_measure():
+    df = _flights(['A'], [1], [48.0], [9.0], False)
+    with pytest.raises(ValueError):
+        trackmiles.calculate_remaining_track_miles(df, 'geodesic')
@@ -1,29 +1,105 @@
 import pandas as pd
 import numpy as np
-from geopy.distance import geodesic
+from geo import EARTH_RADIUS_KM, cheap_ruler_np, geodetic_to_ecef_np
 
+try:
+    from trackmiles_kernel import rtm_kernel
+except ImportError:
+    rtm_kernel = None
 
-def calculate_remaining_track_miles(df):
-    df = df.groupby('callsign').apply(calculate_rtm)
-    df = df.reset_index(drop=True)
+DISTANCE_MEASURES = ('cheap_ruler', 'haversine', 'ecef_chord')
+
+
+def calculate_remaining_track_miles(df, measure='cheap_ruler'):
+    """
+    Adds the column 'rtm' with the remaining track miles in km of each point.
+
+    :param df: DataFrame with columns 'callsign', 'time', 'lat', 'lon' and 'onground'
+    :param measure: distance between consecutive points, 'cheap_ruler', 'haversine' or 'ecef_chord'
+    :return: DataFrame with a fresh RangeIndex, sorted by callsign and, within each callsign, by time
+    """
+    # Nach Flug und Zeit sortieren, Flüge werden über die Integer-Codes der Callsigns getrennt
+    codes, _ = pd.factorize(df['callsign'], sort=True)
+    order = np.lexsort((df['time'].to_numpy(), codes))
+    df = df.iloc[order].reset_index(drop=True)
+    codes = codes[order]
+    flight_start = np.empty(len(codes), dtype=bool)
+    flight_start[:1] = True
+    flight_start[1:] = codes[1:] != codes[:-1]
+    df['rtm'] = _remaining_track_miles(df['lat'].to_numpy(), df['lon'].to_numpy(),
+                                       df['onground'].to_numpy(dtype=bool), flight_start, measure)
+    return df
+
+
+def calculate_rtm(df, measure='cheap_ruler'):
+    n = len(df)
+    df['rtm'] = _remaining_track_miles(df['lat'].to_numpy(), df['lon'].to_numpy(),
+                                       df['onground'].to_numpy(dtype=bool), np.zeros(n, dtype=bool), measure)
     return df
 
 
-def calculate_rtm(df):
-    distances = [0]
-    rtm = 0
+def _remaining_track_miles(lat, lon, onground, flight_start, measure):
+    """
+    Remaining track miles in km of each point, for several flights stored one after another.
+
+    :param lat: NumPy array of latitudes, sorted by flight and time
+    :param lon: NumPy array of longitudes, sorted by flight and time
+    :param onground: boolean NumPy array, True where the aircraft is on the ground
+    :param flight_start: boolean NumPy array, True at the first point of each flight
+    :param measure: distance between consecutive points, 'cheap_ruler', 'haversine' or 'ecef_chord'
+    :return: NumPy array of remaining track miles in km
+    """
+    if measure not in DISTANCE_MEASURES:
+        raise ValueError(f"unknown distance measure '{measure}', expected one of {list(DISTANCE_MEASURES)}")
+    n = len(lat)
+
+    # Der Kernel rechnet mit cheap ruler oder haversine, die Sehnen werden unten vektorisiert berechnet
+    if rtm_kernel is not None and measure != 'ecef_chord':
+        result = np.empty(n)
+        flight_starts = np.append(np.flatnonzero(flight_start | (np.arange(n) == 0)), n)
+        rtm_kernel(lat.astype(np.float64), lon.astype(np.float64), onground, flight_starts,
+                   measure == 'cheap_ruler', result)
+        return result
+
+    # Distanz vom vorherigen Punkt, am Boden und am Anfang eines Fluges wird nicht weitergezählt
+    reset = onground | flight_start
+    segments = np.zeros(n)
+    segments[1:] = _consecutive_distances(lat, lon, measure)
+    segments[reset] = 0
+
+    # Rückwärts aufsummieren, ab dem nächsten Bodenpunkt oder Flugbeginn beginnt die Summe wieder bei 0
+    remaining = np.append(np.cumsum(segments[::-1])[::-1], 0)
+    next_reset = np.minimum.accumulate(np.where(reset, np.arange(n), n)[::-1])[::-1]
+    rtm = remaining[:n] - remaining[next_reset]
+
+    # Jeder Punkt erhält die Strecke ab dem folgenden Punkt, der letzte Punkt eines Fluges 0
+    result = np.zeros(n)
+    result[:-1] = rtm[1:]
+    return result
 
-    # Gehe die Punkte in umgekehrter Reihenfolge durch
-    for i in range(len(df) - 1, 0, -1):
-        if df.iloc[i]['onground']:
-            rtm = 0
-        else:
-            point1 = (df.iloc[i - 1]['lat'], df.iloc[i - 1]['lon'])
-            point2 = (df.iloc[i]['lat'], df.iloc[i]['lon'])
-            rtm += geodesic(point1, point2).kilometers
 
-        distances.append(rtm)
+def _consecutive_distances(lat, lon, measure):
+    """
+    Distances in km between consecutive points. Per-point trigonometry is computed once and shared by
+    the two segments adjacent to each point.
 
-    distances.reverse()  # Da wir rückwärts gezählt haben, muss die Liste umgedreht werden
-    df['rtm'] = distances
-    return df
\ No newline at end of file
+    :param lat: NumPy array of latitudes
+    :param lon: NumPy array of longitudes
+    :param measure: 'cheap_ruler', 'haversine' or 'ecef_chord'
+    :return: NumPy array of len(lat) - 1 distances in km
+    """
+    # In float32 würden die Differenzen auf etwa 0,5 m pro Segment gerundet, wie im Kernel in float64 rechnen
+    lat = lat.astype(np.float64, copy=False)
+    lon = lon.astype(np.float64, copy=False)
+    if measure == 'ecef_chord':
+        # Jeder Punkt wird nur einmal umgerechnet, danach ist jede Distanz eine Sehne ohne Winkelfunktionen
+        xyz = np.stack(geodetic_to_ecef_np(lat, lon))
+        return np.sqrt((np.diff(xyz, axis=1) ** 2).sum(axis=0))
+    if measure == 'haversine':
+        # cos(lat) wird einmal pro Punkt statt zweimal pro Segment berechnet
+        lat = np.radians(lat)
+        lon = np.radians(lon)
+        coslat = np.cos(lat)
+        a = np.sin(np.diff(lat) / 2) ** 2 + coslat[:-1] * coslat[1:] * np.sin(np.diff(lon) / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+    return cheap_ruler_np(lat[:-1], lon[:-1], lat[1:], lon[1:])
@@ -0,0 +1,76 @@
+import math
+from numba import njit, prange
+from geo import EARTH_RADIUS_KM, WGS84_FLATTENING, WGS84_RADIUS_KM
+
+
+@njit(fastmath=True, cache=True)
+def _cheap_ruler_km(lat1, lon1, lat2, lon2):
+    """
+    Distance in km between two points in degrees, see `geo.cheap_ruler_np`.
+    """
+    e2 = WGS84_FLATTENING * (2 - WGS84_FLATTENING)
+    coslat = math.cos(math.radians((lat1 + lat2) / 2))
+    w2 = 1 / (1 - e2 * (1 - coslat ** 2))
+    w = math.sqrt(w2)
+    kx = math.radians(WGS84_RADIUS_KM) * w * coslat
+    ky = math.radians(WGS84_RADIUS_KM) * w * w2 * (1 - e2)
+    dlon = (lon2 - lon1 + 180) % 360 - 180
+    return math.sqrt((dlon * kx) ** 2 + ((lat2 - lat1) * ky) ** 2)
+
+
+@njit(fastmath=True, cache=True)
+def _sin_small(x):
+    """
+    sin(x), evaluated as Taylor polynomial for the small angles between consecutive ADS-B positions
+    (relative error below 1e-15 for |x| < 0.01 rad, about 60 km) and with `math.sin` otherwise.
+    """
+    if abs(x) < 0.01:
+        x2 = x * x
+        return x * (1 - x2 / 6 * (1 - x2 / 20))
+    return math.sin(x)
+
+
+@njit(fastmath=True, cache=True)
+def _haversine_km(lat1, lon1, lat2, lon2, coslat1, coslat2):
+    """
+    Distance in km between two points in degrees, see `geo.haversine_np`.
+    The cosines of both latitudes are passed in, so that each point's cosine is computed only once.
+    """
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = _sin_small(dlat / 2) ** 2 + coslat1 * coslat2 * _sin_small(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def rtm_kernel(lat, lon, onground, flight_starts, cheap_ruler, out):
+    """
+    Computes the remaining track miles in km of each point in a single pass, one flight per thread.
+
+    :param lat: float64 NumPy array of latitudes, sorted by flight and time
+    :param lon: float64 NumPy array of longitudes, sorted by flight and time
+    :param onground: boolean NumPy array, True where the aircraft is on the ground
+    :param flight_starts: NumPy array with the index of the first point of each flight, followed by len(lat)
+    :param cheap_ruler: True for the cheap ruler distance, False for haversine
+    :param out: float64 NumPy array the remaining track miles are written to
+    :return: None
+    """
+    for flight in prange(len(flight_starts) - 1):
+        start = flight_starts[flight]
+        end = flight_starts[flight + 1]
+
+        # Gehe die Punkte in umgekehrter Reihenfolge durch
+        rtm = 0.0
+        out[end - 1] = 0.0
+        # cos(lat) eines Punktes wird für beide angrenzenden Segmente genutzt
+        coslat = math.cos(math.radians(lat[end - 1]))
+        for i in range(end - 1, start, -1):
+            coslat_prev = math.cos(math.radians(lat[i - 1])) if not cheap_ruler else 0.0
+            if onground[i]:
+                rtm = 0.0
+            elif cheap_ruler:
+                rtm += _cheap_ruler_km(lat[i - 1], lon[i - 1], lat[i], lon[i])
+            else:
+                rtm += _haversine_km(lat[i - 1], lon[i - 1], lat[i], lon[i], coslat_prev, coslat)
+            out[i - 1] = rtm
+            coslat = coslat_prev